@@ -0,0 +1,71 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+
+state = threading.local()
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    previous = getattr(state, 'use_replica', False)
+    state.use_replica = enabled
+    try:
+        yield
+    finally:
+        state.use_replica = previous
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if (getattr(state, 'use_replica', False)
+                and REPLICA_DB_ALIAS in settings.DATABASES):
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(request.method in ('GET', 'HEAD')):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class HealthCheckMixin:
+    health_check_done = True
+
+    def _cursor(self, name=None):
+        # Checked on the first query of a request rather than on every
+        # request, the way Django 4.1 does it.
+        if not self.health_check_done:
+            self.health_check_done = True
+            if self.connection is not None and not self.is_usable():
+                self.close()
+        return super()._cursor(name)
+
+
+class ConnectionHealthCheckMiddleware:
+    def __init__(self, get_response):
+        if not settings.DB_CONN_HEALTH_CHECKS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        for connection in connections.all():
+            connection.health_check_done = False
+        return self.get_response(request)
@@ -0,0 +1,92 @@
+import hmac
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+    generate_latest, multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    'foodgram_request_latency_seconds',
+    'Request latency by view',
+    ['view', 'method'],
+)
+REQUEST_QUERIES = Histogram(
+    'foodgram_request_db_queries',
+    'Database queries per request by view',
+    ['view', 'method'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float('inf')),
+)
+RESPONSE_SIZE = Histogram(
+    'foodgram_response_size_bytes',
+    'Response body size by view',
+    ['view', 'method'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, float('inf')),
+)
+RECIPE_CACHE_LOOKUPS = Counter(
+    'foodgram_recipe_cache_lookups_total',
+    'Recipe fragment cache lookups',
+    ['result'],
+)
+PDF_RENDER_TIME = Histogram(
+    'foodgram_pdf_render_seconds',
+    'Shopping list PDF render time',
+)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+        latency = time.perf_counter() - start
+        match = request.resolver_match
+        labels = (match.view_name if match else 'unmatched', request.method)
+        REQUEST_LATENCY.labels(*labels).observe(latency)
+        REQUEST_QUERIES.labels(*labels).observe(queries)
+        if response.streaming:
+            size = response.get('Content-Length')
+        else:
+            size = len(response.content)
+        if size is not None:
+            RESPONSE_SIZE.labels(*labels).observe(int(size))
+        return response
+
+
+def is_scrape_allowed(request):
+    # The backend port is published, so without a token only local
+    # scrapes are served.
+    if not settings.METRICS_TOKEN:
+        return request.META.get('REMOTE_ADDR') in ('127.0.0.1', '::1')
+    return hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''),
+        f'Bearer {settings.METRICS_TOKEN}')
+
+
+def metrics(request):
+    if not is_scrape_allowed(request):
+        return HttpResponseForbidden()
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry),
+                        content_type=CONTENT_TYPE_LATEST)
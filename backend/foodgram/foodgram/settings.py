@@ -24,11 +24,15 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
     'djoser',
     'users',
-    'recipes',
+    'recipes.apps.RecipiesConfig',
 ]
 
 MIDDLEWARE = [
+    'foodgram.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'foodgram.db.ConnectionHealthCheckMiddleware',
+    'django.middleware.gzip.GZipMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -57,14 +61,51 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'foodgram.wsgi.application'
 
+DB_CONN_HEALTH_CHECKS = os.getenv(
+    'DB_CONN_HEALTH_CHECKS', default='True') == 'True'
+
+DB_ENGINE = os.getenv('DB_ENGINE', default='django.db.backends.postgresql')
+if DB_CONN_HEALTH_CHECKS and DB_ENGINE == 'django.db.backends.postgresql':
+    # The stock backend plus a lazy check of reused connections.
+    DB_ENGINE = 'foodgram.backends.postgresql'
+
 DATABASES = {
     'default': {
-        'ENGINE': os.getenv('DB_ENGINE', default='django.db.backends.postgresql'),
+        'ENGINE': DB_ENGINE,
         'NAME': os.getenv('DB_NAME', default='postgres'),
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
         'PORT': os.getenv('DB_PORT', default=5432),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+    }
+}
+
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME',
+                          default=DATABASES['default']['NAME']),
+        'HOST': os.getenv('DB_REPLICA_HOST',
+                          default=DATABASES['default']['HOST']),
+        'PORT': os.getenv('DB_REPLICA_PORT',
+                          default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['foodgram.db.ReplicaRouter']
+
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+# Signal invalidation only reaches the local memory of the process that
+# saved the object, so without a shared backend entries must expire fast.
+CACHE_IS_LOCAL = CACHE_BACKEND.endswith('LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+        'TIMEOUT': int(os.getenv(
+            'CACHE_TIMEOUT', default=10 if CACHE_IS_LOCAL else 60 * 60)),
     }
 }
 
@@ -99,8 +140,35 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static")
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+MAX_IMAGE_UPLOAD_SIZE = int(os.getenv('MAX_IMAGE_UPLOAD_SIZE',
+                                      default=10 * 1024 * 1024))
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+# Unreferenced images younger than this are kept: a new recipe may be about
+# to reuse them.
+IMAGE_DELETE_GRACE = int(os.getenv('IMAGE_DELETE_GRACE', default=60 * 60))
+
 AUTH_USER_MODEL = 'users.User'
 
+PDF_FONT_PATH = os.path.join(BASE_DIR, 'DejaVuSerif.ttf')
+PDF_RENDER_PROCESSES = int(os.getenv('PDF_RENDER_PROCESSES', default=0))
+
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+
+# A change committed this many seconds after its id was taken is still
+# delivered to clients that have already read past that id.
+CHANGES_OVERLAP = int(os.getenv('CHANGES_OVERLAP', default=5 * 60))
+
+JOB_QUEUE_BACKEND = os.getenv('JOB_QUEUE_BACKEND',
+                              default='recipes.jobs.DatabaseQueue')
+# A running job whose worker died is re-queued after this many seconds and
+# failed for good after JOB_MAX_ATTEMPTS tries.
+JOB_LEASE_TIMEOUT = int(os.getenv('JOB_LEASE_TIMEOUT', default=30 * 60))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', default=3))
+# Finished jobs and their export files are deleted after this many seconds.
+JOB_RETENTION = int(os.getenv('JOB_RETENTION', default=24 * 60 * 60))
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -110,6 +178,15 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.TokenAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "recipes.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "recipes.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 
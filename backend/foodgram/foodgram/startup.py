@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.cache import close_caches
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+
+from recipes.cache import get_tag_ids
+from recipes.pdf import register_font
+
+
+def warm_up():
+    get_resolver().url_patterns
+    register_font(settings.PDF_FONT_PATH)
+    try:
+        get_tag_ids()
+    except DatabaseError:
+        # Fresh deploys start before migrations are applied.
+        pass
+    # Workers are forked from this process and must not share its sockets.
+    connections.close_all()
+    close_caches()
@@ -0,0 +1,43 @@
+import multiprocessing
+import os
+import shutil
+
+bind = '0:8000'
+# With CONN_MAX_AGE every thread keeps its own persistent connection, so
+# workers * threads must fit into Postgres max_connections (100 by default)
+# minus what run_jobs, migrations and psql sessions need.
+db_connections = int(os.getenv('GUNICORN_DB_CONNECTIONS', default=80))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='gthread')
+threads = int(os.getenv('GUNICORN_THREADS', default=4))
+workers = int(os.getenv('GUNICORN_WORKERS', default=max(1, min(
+    multiprocessing.cpu_count() * 2 + 1, db_connections // threads))))
+preload_app = os.getenv('GUNICORN_PRELOAD', default='True') == 'True'
+
+# The preloaded app creates its metric files before any server hook runs,
+# so the directory is reset while the config is read. SIGHUP re-reads this
+# file in the same master, and a SIGUSR2 master inherits the environment;
+# neither may wipe files that running processes still write to.
+multiproc_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+if multiproc_dir and not os.getenv('GUNICORN_MULTIPROC_DIR_READY'):
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir)
+    os.environ['GUNICORN_MULTIPROC_DIR_READY'] = '1'
+
+
+def on_starting(server):
+    if workers * threads > db_connections:
+        server.log.warning(
+            'workers * threads = %s exceeds GUNICORN_DB_CONNECTIONS = %s',
+            workers * threads, db_connections)
+
+
+def when_ready(server):
+    if preload_app:
+        from foodgram.startup import warm_up
+        warm_up()
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,27 +1,96 @@
+from functools import reduce
+from operator import or_
+
 from django.contrib import admin
+from django.contrib.admin.utils import lookup_needs_distinct
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 
 from .models import (
     Favorite, Ingredient, Recipe, RecipeIngredient, ShoppingCart, Tag,
 )
+from .pagination import EstimatedCountPaginator
+from .signals import deferred_touch
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # The stock istartswith/iexact compile to UPPER(column), which plain
+    # btree indexes cannot serve.
+    search_lookups = {'^': 'startswith', '=': 'exact'}
+
+    def get_search_results(self, request, queryset, search_term):
+        search_fields = self.get_search_fields(request)
+        if (not search_term or not search_fields
+                or any(field[0] not in self.search_lookups
+                       for field in search_fields)):
+            return super().get_search_results(
+                request, queryset, search_term)
+        lookups = [f'{field[1:]}__{self.search_lookups[field[0]]}'
+                   for field in search_fields]
+        for bit in search_term.split():
+            queryset = queryset.filter(reduce(
+                or_, (Q(**{lookup: bit}) for lookup in lookups)))
+        use_distinct = any(lookup_needs_distinct(self.opts, lookup)
+                           for lookup in lookups)
+        return queryset, use_distinct
+
+
+class RecipeIngredientInline(admin.TabularInline):
+    model = RecipeIngredient
+    autocomplete_fields = ('ingredients',)
+    extra = 1
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(LargeTableAdmin):
     list_display = ('name', 'author', 'favorites_count',)
-    list_filter = ('name', 'author', 'tags')
-    search_fields = ('name', 'author', 'tags')
+    list_filter = ('tags',)
+    list_select_related = ('author',)
+    search_fields = ('^name', '=author__username', '=tags__slug')
+    autocomplete_fields = ('author',)
+    filter_horizontal = ('tags',)
+    inlines = (RecipeIngredientInline,)
+
+    def get_queryset(self, request):
+        favorites = Favorite.objects.filter(
+            recipe=OuterRef('pk')).order_by().values('recipe').annotate(
+            total=Count('id')).values('total')
+        return super().get_queryset(request).annotate(favorites_total=Coalesce(
+            Subquery(favorites, output_field=IntegerField()), 0))
+
+    def favorites_count(self, recipe):
+        return recipe.favorites_total
+    favorites_count.short_description = 'В избранном'
+    favorites_count.admin_order_field = 'favorites_total'
+
+    def save_related(self, request, form, formsets, change):
+        with deferred_touch():
+            super().save_related(request, form, formsets, change)
 
 
 @admin.register(Ingredient)
-class IngredientAdmin(admin.ModelAdmin):
+class IngredientAdmin(LargeTableAdmin):
     list_display = (
         'name', 'measurement_unit',
     )
-    list_filter = ('name',)
-    search_fields = ('name',)
+    search_fields = ('^name',)
+
+
+@admin.register(RecipeIngredient)
+class RecipeIngredientAdmin(LargeTableAdmin):
+    list_display = ('recipe', 'ingredients', 'amount')
+    list_select_related = ('recipe', 'ingredients')
+    autocomplete_fields = ('recipe', 'ingredients')
+
+
+@admin.register(Favorite, ShoppingCart)
+class UserRecipeAdmin(LargeTableAdmin):
+    list_display = ('user', 'recipe')
+    list_select_related = ('user', 'recipe')
+    search_fields = ('=user__username',)
+    autocomplete_fields = ('user', 'recipe')
 
 
 admin.site.register(Tag)
-admin.site.register(RecipeIngredient)
-admin.site.register(ShoppingCart)
-admin.site.register(Favorite)
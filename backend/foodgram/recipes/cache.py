@@ -0,0 +1,55 @@
+import hashlib
+from functools import lru_cache
+
+from django.core.cache import cache
+
+from foodgram.metrics import RECIPE_CACHE_LOOKUPS
+from .models import Tag
+
+RECIPE_CACHE_KEY = 'recipe:{}'
+TAG_IDS_CACHE_KEY = 'tag_ids'
+
+
+def get_recipe_cache_key(recipe_id):
+    return RECIPE_CACHE_KEY.format(recipe_id)
+
+
+@lru_cache(maxsize=None)
+def get_recipe_cache_version():
+    # Fragments cached by a previous deploy are ignored once the serialized
+    # layout changes.
+    from .serializers import RecipeCoreSerializer
+    return hashlib.md5(repr(RecipeCoreSerializer()).encode()).hexdigest()
+
+
+def get_cached_recipes(recipe_ids):
+    keys = {get_recipe_cache_key(recipe_id): recipe_id
+            for recipe_id in recipe_ids}
+    cached = cache.get_many(keys, version=get_recipe_cache_version())
+    RECIPE_CACHE_LOOKUPS.labels('hit').inc(len(cached))
+    RECIPE_CACHE_LOOKUPS.labels('miss').inc(len(keys) - len(cached))
+    return {keys[key]: data for key, data in cached.items()}
+
+
+def set_cached_recipes(recipes_data):
+    cache.set_many({get_recipe_cache_key(recipe_id): data
+                    for recipe_id, data in recipes_data.items()},
+                   version=get_recipe_cache_version())
+
+
+def invalidate_recipes(recipe_ids):
+    cache.delete_many([get_recipe_cache_key(recipe_id)
+                       for recipe_id in recipe_ids],
+                      version=get_recipe_cache_version())
+
+
+def get_tag_ids():
+    tag_ids = cache.get(TAG_IDS_CACHE_KEY)
+    if tag_ids is None:
+        tag_ids = dict(Tag.objects.values_list('slug', 'id'))
+        cache.set(TAG_IDS_CACHE_KEY, tag_ids)
+    return tag_ids
+
+
+def invalidate_tag_ids():
+    cache.delete(TAG_IDS_CACHE_KEY)
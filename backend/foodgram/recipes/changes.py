@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max, Min
+
+from users.models import Follow
+from .models import Change, Favorite, Ingredient, Recipe, ShoppingCart, Tag
+
+CATALOG = (
+    (Change.RECIPES, Recipe),
+    (Change.TAGS, Tag),
+    (Change.INGREDIENTS, Ingredient),
+)
+RELATIONS = (
+    (Change.FAVORITES, Favorite, 'recipe_id'),
+    (Change.SHOPPING_CART, ShoppingCart, 'recipe_id'),
+    (Change.SUBSCRIPTIONS, Follow, 'author_id'),
+)
+
+
+def log_changes(model, object_ids, user_id=None, deleted=False):
+    Change.objects.bulk_create(
+        Change(model=model, object_id=object_id, user_id=user_id,
+               deleted=deleted)
+        for object_id in object_ids)
+
+
+def get_latest_cursor():
+    return Change.objects.aggregate(Max('id'))['id__max'] or 0
+
+
+def parse_cursor(cursor):
+    cursor = int(cursor)
+    if not 0 <= cursor <= get_latest_cursor():
+        raise ValueError(cursor)
+    return cursor
+
+
+def get_rescan_start(since):
+    # Ids come from a sequence at insert time, not at commit time: a
+    # transaction can commit a lower id after a client has read past it.
+    # Changes logged shortly before the cursor are therefore read again.
+    created_at = Change.objects.filter(id=since).values_list(
+        'created_at', flat=True).first()
+    if created_at is None:
+        return since
+    overlap = timedelta(seconds=settings.CHANGES_OVERLAP)
+    first = Change.objects.filter(
+        created_at__gte=created_at - overlap).aggregate(Min('id'))['id__min']
+    return min(since, first - 1)
+
+
+def split_changes(changes):
+    latest = dict(changes.order_by('id').values_list('object_id', 'deleted'))
+    return (
+        sorted(pk for pk, deleted in latest.items() if not deleted),
+        sorted(pk for pk, deleted in latest.items() if deleted),
+    )
+
+
+def get_current_ids(model):
+    queryset = (model.objects.visible() if model is Recipe
+                else model.objects.all())
+    return list(queryset.values_list('id', flat=True))
+
+
+def get_changes(user, since=None):
+    # Taken before the snapshot, so a concurrent change is reported twice
+    # rather than lost.
+    cursor = get_latest_cursor()
+    changes = Change.objects.filter(id__lte=cursor)
+    if since is not None:
+        changes = changes.filter(id__gt=get_rescan_start(since))
+    result = {'cursor': str(cursor)}
+    for name, model in CATALOG:
+        if since is None:
+            updated, deleted = get_current_ids(model), []
+        else:
+            updated, deleted = split_changes(
+                changes.filter(model=name, user_id=None))
+        result[name] = {'updated': updated, 'deleted': deleted}
+    if not user.is_authenticated:
+        return result
+    for name, model, field in RELATIONS:
+        if since is None:
+            added, removed = list(model.objects.filter(user=user).values_list(
+                field, flat=True)), []
+        else:
+            added, removed = split_changes(
+                changes.filter(model=name, user_id=user.pk))
+        result[name] = {'added': added, 'removed': removed}
+    return result
@@ -1,6 +1,7 @@
 import base64
 import uuid
 
+from django.conf import settings
 from django.core.files.base import ContentFile
 from rest_framework import serializers
 
@@ -9,6 +10,9 @@ class Base64ImageField(serializers.ImageField):
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
             format, imgstr = data.split(';base64,')
+            if len(imgstr) * 3 // 4 > settings.MAX_IMAGE_UPLOAD_SIZE:
+                raise serializers.ValidationError(
+                    'Размер изображения превышает допустимый.')
             ext = format.split('/')[-1]
             id = uuid.uuid4()
             data = ContentFile(base64.b64decode(imgstr),
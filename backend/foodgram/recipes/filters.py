@@ -1,8 +1,44 @@
-from django_filters import AllValuesMultipleFilter, rest_framework as filters
-from django_filters.widgets import BooleanWidget
+from django import forms
+from django_filters import rest_framework as filters
+from django_filters.widgets import BooleanWidget, QueryArrayWidget
 from rest_framework.filters import SearchFilter
 
-from .models import Recipe, Tag
+from .cache import get_tag_ids
+from .models import Recipe
+
+
+class IntegerListField(forms.Field):
+    widget = QueryArrayWidget
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return [int(item) for item in value]
+        except (TypeError, ValueError):
+            raise forms.ValidationError('Введите список целых чисел')
+
+
+class TagSlugListField(forms.Field):
+    widget = QueryArrayWidget
+
+    def to_python(self, value):
+        if not value:
+            return []
+        tag_ids = get_tag_ids()
+        unknown = [slug for slug in value if slug not in tag_ids]
+        if unknown:
+            raise forms.ValidationError(
+                f'Тэги не найдены: {", ".join(unknown)}')
+        return [tag_ids[slug] for slug in value]
+
+
+class AuthorFilter(filters.Filter):
+    field_class = IntegerListField
+
+
+class TagSlugFilter(filters.Filter):
+    field_class = TagSlugListField
 
 
 class RecipeFilter(filters.FilterSet):
@@ -12,23 +48,20 @@ class RecipeFilter(filters.FilterSet):
     is_favorited = filters.BooleanFilter(
         method='filter_is_favorited', widget=BooleanWidget()
     )
-    tags = filters.ModelMultipleChoiceFilter(
-        field_name='tags__slug',
-        to_field_name='slug',
-        queryset=Tag.objects.all(),
-    )
-    author = AllValuesMultipleFilter(field_name='author__id')
+    tags = TagSlugFilter(field_name='tags__id', lookup_expr='in',
+                         distinct=True)
+    author = AuthorFilter(field_name='author_id', lookup_expr='in')
 
     def filter_is_favorited(self, queryset, name, value):
         user = self.request.user
         if value:
-            return Recipe.objects.filter(favorites__user=user)
+            return queryset.filter(favorites__user=user)
         return queryset
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
         user = self.request.user
         if value:
-            return Recipe.objects.filter(shopping_cart__user=user)
+            return queryset.filter(shopping_cart__user=user)
         return queryset
 
     class Meta:
@@ -0,0 +1,195 @@
+import json
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from foodgram.metrics import PDF_RENDER_TIME
+from users.models import Follow, User
+from .models import (
+    Change, Favorite, Job, Recipe, RecipeBucket, RecipeIngredient,
+    RecipeSignature, ShoppingCart,
+)
+from .pdf import render_shopping_list
+from .utils import get_shopping_list_data, render_shopping_list_csv
+
+HANDLERS = {}
+
+EXPORT_FORMATS = ('pdf', 'csv')
+
+PURGE_BATCH_SIZE = 1000
+
+
+def handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+class BaseQueue:
+    def enqueue(self, kind, payload=None, user=None):
+        raise NotImplementedError
+
+    def claim(self):
+        raise NotImplementedError
+
+    def requeue_stale(self):
+        raise NotImplementedError
+
+    def prune(self):
+        raise NotImplementedError
+
+    def run(self, job):
+        try:
+            HANDLERS[job.kind](job, json.loads(job.payload))
+        except Exception as error:
+            job.status = Job.FAILED
+            job.error = repr(error)
+        else:
+            job.status = Job.DONE
+        job.finished_at = timezone.now()
+        job.save()
+
+
+class DatabaseQueue(BaseQueue):
+    def enqueue(self, kind, payload=None, user=None):
+        return Job.objects.create(
+            kind=kind, payload=json.dumps(payload or {}), user=user)
+
+    def claim(self):
+        with transaction.atomic():
+            job = Job.objects.select_for_update(skip_locked=True).filter(
+                status=Job.PENDING).order_by('id').first()
+            if job is not None:
+                job.status = Job.RUNNING
+                job.started_at = timezone.now()
+                job.attempts += 1
+                job.save(update_fields=['status', 'started_at', 'attempts'])
+        return job
+
+    def requeue_stale(self):
+        now = timezone.now()
+        stale = Job.objects.filter(
+            status=Job.RUNNING,
+            started_at__lt=now - timedelta(seconds=settings.JOB_LEASE_TIMEOUT))
+        stale.filter(attempts__gte=settings.JOB_MAX_ATTEMPTS).update(
+            status=Job.FAILED, error='Превышено время выполнения',
+            finished_at=now)
+        return stale.update(status=Job.PENDING, started_at=None)
+
+    def prune(self):
+        expired = Job.objects.filter(
+            status__in=(Job.DONE, Job.FAILED),
+            finished_at__lt=timezone.now() - timedelta(
+                seconds=settings.JOB_RETENTION)).order_by('id')
+        storage = Job._meta.get_field('result').storage
+        pruned = 0
+        while True:
+            batch = list(expired.values_list(
+                'id', 'result')[:PURGE_BATCH_SIZE])
+            if not batch:
+                return pruned
+            # Rows go first: a leftover file is harmless, a row pointing
+            # to a missing file is not.
+            Job.objects.filter(pk__in=[pk for pk, _ in batch]).delete()
+            for _, name in batch:
+                if name:
+                    storage.delete(name)
+            pruned += len(batch)
+
+
+def get_queue():
+    return import_string(settings.JOB_QUEUE_BACKEND)()
+
+
+@handler('shopping_cart_export')
+def export_shopping_cart(job, payload):
+    export_format = payload['format']
+    shopping_list = get_shopping_list_data(job.user)
+    if export_format == 'csv':
+        content = render_shopping_list_csv(shopping_list)
+    else:
+        with PDF_RENDER_TIME.time():
+            content = render_shopping_list(
+                shopping_list, settings.PDF_FONT_PATH)
+    job.result.save(f'shopping_list_{uuid.uuid4().hex}.{export_format}',
+                    ContentFile(content), save=False)
+
+
+def bury(model, user_field, object_field):
+    def get_removed(batch):
+        return [
+            Change(model=model, user_id=user_id, object_id=object_id,
+                   deleted=True)
+            for user_id, object_id in batch.values_list(user_field,
+                                                        object_field)
+        ]
+    return get_removed
+
+
+def delete_in_batches(queryset, get_removed=None):
+    queryset = queryset.order_by()
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:PURGE_BATCH_SIZE])
+        if not ids:
+            return
+        batch = queryset.model.objects.filter(pk__in=ids)
+        with transaction.atomic():
+            if get_removed is not None:
+                Change.objects.bulk_create(get_removed(batch))
+            batch._raw_delete(batch.db)
+
+
+def delete_images(names):
+    storage = Recipe._meta.get_field('image').storage
+    referenced = set(Recipe.objects.filter(image__in=names).values_list(
+        'image', flat=True))
+    for name in names - referenced:
+        storage.delete_stale(name, settings.IMAGE_DELETE_GRACE)
+
+
+def purge_recipes(recipe_ids):
+    images = set(Recipe.objects.filter(pk__in=recipe_ids).exclude(
+        image='').values_list('image', flat=True))
+    delete_in_batches(Favorite.objects.filter(recipe_id__in=recipe_ids),
+                      bury(Change.FAVORITES, 'user_id', 'recipe_id'))
+    delete_in_batches(ShoppingCart.objects.filter(recipe_id__in=recipe_ids),
+                      bury(Change.SHOPPING_CART, 'user_id', 'recipe_id'))
+    for model in (RecipeIngredient, Recipe.tags.through, RecipeSignature,
+                  RecipeBucket):
+        delete_in_batches(model.objects.filter(recipe_id__in=recipe_ids))
+    delete_in_batches(Recipe.objects.filter(pk__in=recipe_ids))
+    delete_images(images)
+
+
+@handler('purge_recipe')
+def purge_recipe(job, payload):
+    purge_recipes(list(Recipe.objects.filter(
+        pk=payload['recipe_id'], deleted_at__isnull=False
+    ).values_list('pk', flat=True)))
+
+
+@handler('purge_user')
+def purge_user(job, payload):
+    user = User.objects.filter(pk=payload['user_id'],
+                               deleted_at__isnull=False).first()
+    if user is None:
+        return
+    recipes = Recipe.objects.filter(author=user).order_by()
+    while True:
+        recipe_ids = list(recipes.values_list(
+            'pk', flat=True)[:PURGE_BATCH_SIZE])
+        if not recipe_ids:
+            break
+        purge_recipes(recipe_ids)
+    delete_in_batches(Favorite.objects.filter(user=user))
+    delete_in_batches(ShoppingCart.objects.filter(user=user))
+    delete_in_batches(Follow.objects.filter(user=user))
+    delete_in_batches(Follow.objects.filter(author=user),
+                      bury(Change.SUBSCRIPTIONS, 'user_id', 'author_id'))
+    user.delete()
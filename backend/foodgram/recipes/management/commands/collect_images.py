@@ -0,0 +1,49 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Удаляет файлы картинок, на которые не ссылается ни один рецепт'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=int,
+                            default=settings.IMAGE_DELETE_GRACE,
+                            help='Не трогать файлы моложе N секунд')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        field = Recipe._meta.get_field('image')
+        storage = field.storage
+        root = storage.path(field.upload_to)
+        self.grace = options['grace']
+        deadline = time.time() - self.grace
+        self.removed = 0
+        batch = []
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                if os.path.getmtime(path) > deadline:
+                    continue
+                batch.append(os.path.relpath(path, storage.location))
+                if len(batch) == options['batch_size']:
+                    self.collect(batch, storage, options['dry_run'])
+                    batch = []
+        self.collect(batch, storage, options['dry_run'])
+        self.stderr.write(f'Удалено файлов: {self.removed}')
+
+    def collect(self, names, storage, dry_run):
+        referenced = set(Recipe.objects.filter(image__in=names).values_list(
+            'image', flat=True))
+        for name in names:
+            if name in referenced:
+                continue
+            # The file may have been reused since the walk saw it.
+            if dry_run or storage.delete_stale(name, self.grace):
+                self.stdout.write(name)
+                self.removed += 1
@@ -0,0 +1,66 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe, RecipeIngredient
+
+
+class Command(BaseCommand):
+    help = 'Выгружает рецепты в формате NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        output = (sys.stdout if options['path'] == '-'
+                  else open(options['path'], 'w', encoding='utf-8'))
+        recipes = Recipe.objects.visible().select_related('author').order_by(
+            'pk').iterator(chunk_size=chunk_size)
+        exported = 0
+        try:
+            batch = []
+            for recipe in recipes:
+                batch.append(recipe)
+                if len(batch) == chunk_size:
+                    exported += self.export_batch(batch, output)
+                    batch = []
+            exported += self.export_batch(batch, output)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        self.stderr.write(f'Выгружено рецептов: {exported}')
+
+    def export_batch(self, recipes, output):
+        if not recipes:
+            return 0
+        recipe_ids = [recipe.pk for recipe in recipes]
+        tags = {}
+        for recipe_id, slug in Recipe.tags.through.objects.filter(
+                recipe_id__in=recipe_ids).values_list(
+                'recipe_id', 'tag__slug'):
+            tags.setdefault(recipe_id, []).append(slug)
+        ingredients = {}
+        for recipe_id, name, unit, amount in RecipeIngredient.objects.filter(
+                recipe_id__in=recipe_ids).values_list(
+                'recipe_id', 'ingredients__name',
+                'ingredients__measurement_unit', 'amount'):
+            ingredients.setdefault(recipe_id, []).append({
+                'name': name,
+                'measurement_unit': unit,
+                'amount': amount,
+            })
+        for recipe in recipes:
+            output.write(json.dumps({
+                'author': recipe.author.username,
+                'name': recipe.name,
+                'text': recipe.text,
+                'cooking_time': recipe.cooking_time,
+                'image': recipe.image.name,
+                'tags': tags.get(recipe.pk, []),
+                'ingredients': ingredients.get(recipe.pk, []),
+            }, ensure_ascii=False) + '\n')
+        self.stderr.write(f'Выгружено до рецепта #{recipes[-1].pk}')
+        return len(recipes)
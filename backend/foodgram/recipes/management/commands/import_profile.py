@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+PROFILE_SCRIPT = '''
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
+import foodgram.wsgi
+if {urls}:
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+'''
+
+
+class Command(BaseCommand):
+    help = 'Показывает самые медленные импорты при запуске воркера'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25)
+        parser.add_argument('--skip-urls', action='store_true')
+
+    def handle(self, *args, **options):
+        script = PROFILE_SCRIPT.format(urls=not options['skip_urls'])
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            stderr=subprocess.PIPE, universal_newlines=True, check=True)
+        imports = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            own, cumulative, module = line[len('import time:'):].split('|')
+            imports.append((int(cumulative), int(own), module.rstrip()))
+        total = sum(own for _, own, _ in imports)
+        self.stdout.write(f'Всего на импорты: {total / 1000:.1f} мс')
+        self.stdout.write(
+            f'{"кумулятивно, мс":>16} {"собственное, мс":>16}  модуль')
+        for cumulative, own, module in sorted(imports, reverse=True)[
+                :options['limit']]:
+            self.stdout.write(
+                f'{cumulative / 1000:>16.1f} {own / 1000:>16.1f}  {module}')
@@ -0,0 +1,111 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from recipes.changes import log_changes
+from recipes.models import Change, Ingredient, Recipe, RecipeIngredient, Tag
+from recipes.similarity import update_signatures
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Загружает рецепты из NDJSON, выгруженного export_recipes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        source = (sys.stdin if options['path'] == '-'
+                  else open(options['path'], encoding='utf-8'))
+        self.tags = dict(Tag.objects.values_list('slug', 'id'))
+        self.ingredients = {
+            (name, unit): pk for pk, name, unit
+            in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit')
+        }
+        self.imported = self.skipped = 0
+        try:
+            batch = []
+            for line in source:
+                if line.strip():
+                    batch.append(json.loads(line))
+                if len(batch) == batch_size:
+                    self.import_batch(batch)
+                    batch = []
+            self.import_batch(batch)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        self.stderr.write(f'Загружено рецептов: {self.imported}, '
+                          f'пропущено: {self.skipped}')
+
+    def get_ingredient_ids(self, items):
+        missing = {
+            (ingredient['name'], ingredient['measurement_unit'])
+            for item in items for ingredient in item['ingredients']
+        } - self.ingredients.keys()
+        if missing:
+            Ingredient.objects.bulk_create(
+                Ingredient(name=name, measurement_unit=unit)
+                for name, unit in missing)
+            created = []
+            for pk, name, unit in Ingredient.objects.filter(
+                    name__in={name for name, _ in missing}).values_list(
+                    'id', 'name', 'measurement_unit'):
+                if (name, unit) in missing:
+                    created.append(pk)
+                self.ingredients[(name, unit)] = pk
+            log_changes(Change.INGREDIENTS, created)
+        return self.ingredients
+
+    def import_batch(self, items):
+        if not items:
+            return
+        authors = dict(User.objects.filter(
+            username__in={item['author'] for item in items}).values_list(
+            'username', 'id'))
+        known = [item for item in items if item['author'] in authors]
+        self.skipped += len(items) - len(known)
+        items = known
+        with transaction.atomic():
+            ingredient_ids = self.get_ingredient_ids(items)
+            recipes = [
+                Recipe(
+                    author_id=authors[item['author']],
+                    name=item['name'],
+                    text=item['text'],
+                    cooking_time=item['cooking_time'],
+                    image=item['image'],
+                )
+                for item in items
+            ]
+            if connection.features.can_return_ids_from_bulk_insert:
+                Recipe.objects.bulk_create(recipes)
+                log_changes(Change.RECIPES,
+                            [recipe.pk for recipe in recipes])
+            else:
+                for recipe in recipes:
+                    recipe.save()
+            Recipe.tags.through.objects.bulk_create(
+                Recipe.tags.through(recipe_id=recipe.pk,
+                                    tag_id=self.tags[slug])
+                for recipe, item in zip(recipes, items)
+                for slug in item['tags'] if slug in self.tags
+            )
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(
+                    recipe_id=recipe.pk,
+                    ingredients_id=ingredient_ids[(
+                        ingredient['name'], ingredient['measurement_unit'])],
+                    amount=ingredient['amount'],
+                )
+                for recipe, item in zip(recipes, items)
+                for ingredient in item['ingredients']
+            )
+            update_signatures([recipe.pk for recipe in recipes])
+        self.imported += len(recipes)
+        self.stderr.write(f'Загружено рецептов: {self.imported}')
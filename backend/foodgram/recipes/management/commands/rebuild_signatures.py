@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.models import Recipe
+from recipes.similarity import update_signatures
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает MinHash-сигнатуры рецептов для поиска похожих'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        recipe_ids = Recipe.objects.order_by('pk').values_list(
+            'pk', flat=True).iterator(chunk_size=chunk_size)
+        rebuilt = 0
+        batch = []
+        for recipe_id in recipe_ids:
+            batch.append(recipe_id)
+            if len(batch) == chunk_size:
+                rebuilt += self.rebuild(batch)
+                batch = []
+        rebuilt += self.rebuild(batch)
+        self.stderr.write(f'Пересчитано сигнатур: {rebuilt}')
+
+    def rebuild(self, recipe_ids):
+        with transaction.atomic():
+            update_signatures(recipe_ids)
+        return len(recipe_ids)
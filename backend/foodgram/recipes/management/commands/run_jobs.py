@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from prometheus_client import start_http_server
+
+from recipes.jobs import get_queue
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=1.0)
+        parser.add_argument('--requeue-interval', type=float, default=60.0,
+                            help='Как часто возвращать в очередь задачи '
+                                 'упавших обработчиков, в секундах')
+        parser.add_argument('--prune-interval', type=float, default=3600.0,
+                            help='Как часто удалять устаревшие завершённые '
+                                 'задачи и их файлы, в секундах')
+        parser.add_argument('--metrics-port', type=int,
+                            help='Порт для метрик Prometheus этого процесса')
+        parser.add_argument('--once', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['metrics_port']:
+            start_http_server(options['metrics_port'])
+        queue = get_queue()
+        requeued_at = pruned_at = None
+        while True:
+            close_old_connections()
+            now = time.monotonic()
+            if (requeued_at is None
+                    or now - requeued_at >= options['requeue_interval']):
+                requeued = queue.requeue_stale()
+                if requeued:
+                    self.stderr.write(f'Возвращено в очередь: {requeued}')
+                requeued_at = now
+            if (pruned_at is None
+                    or now - pruned_at >= options['prune_interval']):
+                pruned = queue.prune()
+                if pruned:
+                    self.stderr.write(f'Удалено завершённых задач: {pruned}')
+                pruned_at = now
+            job = queue.claim()
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+                continue
+            queue.run(job)
+            self.stdout.write(str(job))
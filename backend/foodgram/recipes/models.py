@@ -2,6 +2,7 @@ from django.core.validators import MinValueValidator
 from django.db import models
 
 from users.models import User
+from .storage import ContentAddressedStorage
 
 
 class Tag(models.Model):
@@ -22,6 +23,11 @@ class Tag(models.Model):
         unique=True,
         verbose_name='Уникальный слаг'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         verbose_name = 'Тэг'
@@ -34,12 +40,18 @@ class Tag(models.Model):
 class Ingredient(models.Model):
     name = models.CharField(
         max_length=200,
+        db_index=True,
         verbose_name='Название'
     )
     measurement_unit = models.CharField(
         max_length=200,
         verbose_name='Единица измерения'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         verbose_name = 'Ингредиент'
@@ -49,6 +61,11 @@ class Ingredient(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    def visible(self):
+        return self.filter(deleted_at__isnull=True)
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -68,10 +85,12 @@ class Recipe(models.Model):
     )
     image = models.ImageField(
         verbose_name='Картинка',
-        upload_to="media/recipes/images/"
+        upload_to="media/recipes/images/",
+        storage=ContentAddressedStorage()
     )
     name = models.CharField(
         max_length=200,
+        db_index=True,
         verbose_name='Название'
     )
     text = models.TextField(
@@ -83,6 +102,19 @@ class Recipe(models.Model):
                                               'приготовления - одна минута')],
         verbose_name='Время приготовления (в минутах)'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name='Дата удаления'
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
@@ -138,6 +170,11 @@ class Favorite(models.Model):
         on_delete=models.CASCADE,
         related_name='favorites'
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Дата добавления'
+    )
 
     class Meta:
         constraints = [
@@ -162,6 +199,11 @@ class ShoppingCart(models.Model):
         on_delete=models.CASCADE,
         related_name='shopping_cart'
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Дата добавления'
+    )
 
     class Meta:
         constraints = [
@@ -173,3 +215,170 @@ class ShoppingCart(models.Model):
 
     def __str__(self):
         return f'{self.user}, {self.recipe}'
+
+
+class RecipeSignature(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='signature'
+    )
+    signature = models.BinaryField(
+        verbose_name='MinHash-сигнатура'
+    )
+
+    class Meta:
+        verbose_name = 'Сигнатура рецепта'
+        verbose_name_plural = 'Сигнатуры рецептов'
+
+    def __str__(self):
+        return str(self.recipe_id)
+
+
+class RecipeBucket(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='buckets'
+    )
+    band = models.PositiveSmallIntegerField(
+        verbose_name='Номер полосы'
+    )
+    bucket = models.BigIntegerField(
+        verbose_name='Хэш полосы'
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'bucket'], name='recipe_bucket')
+        ]
+        verbose_name = 'LSH-корзина рецепта'
+        verbose_name_plural = 'LSH-корзины рецептов'
+
+    def __str__(self):
+        return f'{self.recipe_id}: {self.band}/{self.bucket}'
+
+
+class Change(models.Model):
+    RECIPES = 'recipes'
+    TAGS = 'tags'
+    INGREDIENTS = 'ingredients'
+    FAVORITES = 'favorites'
+    SHOPPING_CART = 'shopping_cart'
+    SUBSCRIPTIONS = 'subscriptions'
+    MODEL_CHOICES = (
+        (RECIPES, 'Рецепт'),
+        (TAGS, 'Тэг'),
+        (INGREDIENTS, 'Ингредиент'),
+        (FAVORITES, 'Избранное'),
+        (SHOPPING_CART, 'Список покупок'),
+        (SUBSCRIPTIONS, 'Подписка'),
+    )
+
+    model = models.CharField(
+        max_length=20,
+        choices=MODEL_CHOICES,
+        verbose_name='Тип объекта'
+    )
+    object_id = models.PositiveIntegerField(
+        verbose_name='ID объекта'
+    )
+    user_id = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='ID пользователя'
+    )
+    deleted = models.BooleanField(
+        default=False,
+        verbose_name='Удаление'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'user_id', 'id'],
+                         name='change_log')
+        ]
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+
+    def __str__(self):
+        return f'{self.model} #{self.object_id}'
+
+
+class Job(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    kind = models.CharField(
+        max_length=50,
+        verbose_name='Тип задачи'
+    )
+    payload = models.TextField(
+        default='{}',
+        verbose_name='Параметры задачи'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        verbose_name='Пользователь'
+    )
+    result = models.FileField(
+        upload_to='exports/',
+        blank=True,
+        verbose_name='Результат'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Число попыток'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата начала'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата завершения'
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='job_status')
+        ]
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return f'{self.kind} #{self.pk} ({self.status})'
@@ -0,0 +1,50 @@
+import json
+
+from django.conf import settings
+from rest_framework import parsers, status
+from rest_framework.exceptions import APIException, ParseError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class RequestEntityTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Размер запроса превышает допустимый.'
+    default_code = 'request_entity_too_large'
+
+
+class FastJSONParser(parsers.JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MultiPartJSONParser(parsers.MultiPartParser):
+    json_field = 'data'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context['request']
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if content_length > settings.MAX_IMAGE_UPLOAD_SIZE:
+            raise RequestEntityTooLarge
+        result = super().parse(stream, media_type, parser_context)
+        data = result.data.dict()
+        if self.json_field in data:
+            try:
+                data.update(json.loads(data.pop(self.json_field)))
+            except ValueError as error:
+                raise ParseError(f'JSON parse error - {error}')
+        data.update(result.files.dict())
+        return data
@@ -0,0 +1,42 @@
+import io
+
+FONT = 'DejaVuSerif'
+
+
+def register_font(font_path):
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    if FONT not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(FONT, font_path, 'UTF-8'))
+
+
+def render_shopping_list(shopping_list, font_path):
+    from reportlab.pdfgen import canvas
+
+    register_font(font_path)
+    buffer = io.BytesIO()
+    pdf_file = canvas.Canvas(buffer)
+    pdf_file.setFont(FONT, 24)
+    pdf_file.drawString(
+        150,
+        800,
+        'Список покупок.'
+    )
+    pdf_file.setFont(FONT, 14)
+    from_bottom = 750
+    for number, ingredient in enumerate(shopping_list, start=1):
+        pdf_file.drawString(
+            50,
+            from_bottom,
+            f'{number}.  {ingredient["name"]} - {ingredient["amount"]} '
+            f'{ingredient["unit"]}'
+        )
+        from_bottom -= 20
+        if from_bottom <= 50:
+            from_bottom = 800
+            pdf_file.showPage()
+            pdf_file.setFont(FONT, 14)
+    pdf_file.showPage()
+    pdf_file.save()
+    return buffer.getvalue()
@@ -0,0 +1,59 @@
+import math
+import re
+from decimal import Decimal
+
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# orjson writes NaN and Infinity as null, where the strict stdlib renderer
+# raises, and formats exponents differently (1e-9 instead of 1e-09). Such
+# output always contains a null or a digit followed by "e".
+SPECIAL_NUMBER_MARKERS = re.compile(rb'null|[0-9]e')
+
+
+def is_special_float(value):
+    return not math.isfinite(value) or 'e' in repr(value)
+
+
+def has_special_numbers(data):
+    if isinstance(data, float):
+        return is_special_float(data)
+    if isinstance(data, Decimal):
+        # DRF's encoder renders Decimal values as floats.
+        return is_special_float(float(data))
+    if isinstance(data, dict):
+        return any(has_special_numbers(key) or has_special_numbers(value)
+                   for key, value in data.items())
+    if isinstance(data, (list, tuple)):
+        return any(has_special_numbers(item) for item in data)
+    return False
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii
+                or not self.compact or not self.strict
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=(orjson.OPT_PASSTHROUGH_DATETIME
+                        | orjson.OPT_NON_STR_KEYS),
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        if SPECIAL_NUMBER_MARKERS.search(ret) and has_special_numbers(data):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029')
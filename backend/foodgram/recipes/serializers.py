@@ -1,16 +1,24 @@
+from collections import OrderedDict
+
+from django.db import DEFAULT_DB_ALIAS, models, transaction
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
 
+from users.models import Follow, User
 from users.serializers import UserSerializer
+from .cache import get_cached_recipes, set_cached_recipes
 from .fields import Base64ImageField
 from .models import (
-    Favorite, Ingredient, Recipe, RecipeIngredient, ShoppingCart, Tag,
+    Favorite, Ingredient, Job, Recipe, RecipeIngredient, ShoppingCart, Tag,
 )
+from .signals import deferred_touch
+from .similarity import update_signatures
 
 
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
-        fields = '__all__'
+        fields = ('id', 'name', 'color', 'slug')
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -30,16 +38,45 @@ class IngredientInRecipeSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "measurement_unit", "amount")
 
 
-class ViewRecipeSerializer(serializers.ModelSerializer):
+class RecipeAuthorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('id',
+                  'email',
+                  'username',
+                  'first_name',
+                  'last_name')
+
+
+class RecipeCoreSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
-    author = UserSerializer(read_only=True)
+    author = RecipeAuthorSerializer(read_only=True)
     ingredients = IngredientInRecipeSerializer(source="ingredient_to_recipe",
                                                many=True)
-    is_favorited = serializers.SerializerMethodField()
-    is_in_shopping_cart = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
+        fields = (
+            "id",
+            "tags",
+            "author",
+            "ingredients",
+            "name",
+            "image",
+            "text",
+            "cooking_time",
+        )
+
+
+class ViewRecipeListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        recipes = data.all() if isinstance(data, models.Manager) else data
+        return self.child.to_representation_many(list(recipes))
+
+
+class ViewRecipeSerializer(serializers.BaseSerializer):
+
+    class Meta:
         fields = (
             "id",
             "tags",
@@ -52,18 +89,65 @@ class ViewRecipeSerializer(serializers.ModelSerializer):
             "text",
             "cooking_time",
         )
+        list_serializer_class = ViewRecipeListSerializer
 
-    def get_is_favorited(self, recipe):
-        user = self.context['request'].user
-        return (user.is_authenticated and Favorite.objects.filter(
-                recipe=recipe,
-                user=user).exists())
+    def to_representation(self, recipe):
+        data = self.to_representation_many([recipe])
+        if not data:
+            raise NotFound
+        return data[0]
 
-    def get_is_in_shopping_cart(self, recipe):
+    def to_representation_many(self, recipes):
+        core = get_cached_recipes(recipe.pk for recipe in recipes)
+        missing = [recipe.pk for recipe in recipes if recipe.pk not in core]
+        if missing:
+            # Cache fills read from the primary so replica lag is not cached.
+            queryset = Recipe.objects.using(DEFAULT_DB_ALIAS).filter(
+                pk__in=missing).select_related(
+                'author').prefetch_related(
+                'tags', 'ingredient_to_recipe__ingredients')
+            missing_data = {
+                recipe_data['id']: recipe_data for recipe_data
+                in RecipeCoreSerializer(queryset, many=True).data
+            }
+            set_cached_recipes(missing_data)
+            core.update(missing_data)
+        favorited, in_shopping_cart, subscribed = self.get_viewer_flags(
+            recipes)
+        request = self.context['request']
+        data = []
+        for recipe in recipes:
+            if recipe.pk not in core:
+                # Still on a lagging replica, already purged on the primary.
+                continue
+            values = dict(core[recipe.pk])
+            values['author'] = OrderedDict(
+                values['author'],
+                is_subscribed=values['author']['id'] in subscribed)
+            values['is_favorited'] = recipe.pk in favorited
+            values['is_in_shopping_cart'] = recipe.pk in in_shopping_cart
+            if values['image']:
+                values['image'] = request.build_absolute_uri(values['image'])
+            data.append(OrderedDict(
+                (field, values[field]) for field in self.Meta.fields))
+        return data
+
+    def get_viewer_flags(self, recipes):
         user = self.context['request'].user
-        return (user.is_authenticated and ShoppingCart.objects.filter(
-                recipe=recipe,
-                user=user).exists())
+        if not user.is_authenticated:
+            return set(), set(), set()
+        recipe_ids = [recipe.pk for recipe in recipes]
+        author_ids = {recipe.author_id for recipe in recipes}
+        favorited = Favorite.objects.filter(
+            user=user, recipe__in=recipe_ids).values_list(
+            'recipe_id', flat=True)
+        in_shopping_cart = ShoppingCart.objects.filter(
+            user=user, recipe__in=recipe_ids).values_list(
+            'recipe_id', flat=True)
+        subscribed = Follow.objects.filter(
+            user=user, author__in=author_ids).values_list(
+            'author_id', flat=True)
+        return set(favorited), set(in_shopping_cart), set(subscribed)
 
 
 class AddRecipeIngredientsSerializer(serializers.ModelSerializer):
@@ -117,40 +201,43 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         return value
 
     def create_ingredients(self, ingredients, recipe):
-        for ingredient in ingredients:
-            current_ingredient = ingredient["id"]
-            if RecipeIngredient.objects.filter(
-                ingredients=current_ingredient,
-                recipe=recipe,
-            ).exists():
-                raise serializers.ValidationError(
-                    'Убедитесь, что отсутствуют повторяющиеся ингредиенты'
-                )
-            RecipeIngredient.objects.create(
-                ingredients=current_ingredient,
+        ingredient_ids = [ingredient["id"].pk for ingredient in ingredients]
+        if len(set(ingredient_ids)) != len(ingredient_ids):
+            raise serializers.ValidationError(
+                'Убедитесь, что отсутствуют повторяющиеся ингредиенты'
+            )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                ingredients=ingredient["id"],
                 recipe=recipe,
                 amount=ingredient["amount"],
             )
+            for ingredient in ingredients
+        )
 
     def create(self, validated_data):
         author = self.context["request"].user
         tags = validated_data.pop("tags")
         ingredients = validated_data.pop("ingredient_to_recipe")
-        recipe = Recipe.objects.create(**validated_data, author=author)
-        for tag in tags:
-            recipe.tags.add(tag)
-        self.create_ingredients(ingredients, recipe)
+        # Related rows are written in bulk and the recipe is touched once.
+        with transaction.atomic(), deferred_touch():
+            recipe = Recipe.objects.create(**validated_data, author=author)
+            recipe.tags.set(tags)
+            self.create_ingredients(ingredients, recipe)
+            update_signatures([recipe.pk])
         return recipe
 
     def update(self, recipe, validated_data):
-        if "ingredient_to_recipe" in validated_data:
-            ingredients = validated_data.pop("ingredient_to_recipe")
-            recipe.ingredients.clear()
-            self.create_ingredients(ingredients, recipe)
-        if "tags" in validated_data:
-            tags_data = validated_data.pop("tags")
-            recipe.tags.set(tags_data)
-        return super().update(recipe, validated_data)
+        with transaction.atomic(), deferred_touch():
+            if "ingredient_to_recipe" in validated_data:
+                ingredients = validated_data.pop("ingredient_to_recipe")
+                recipe.ingredients.clear()
+                self.create_ingredients(ingredients, recipe)
+            if "tags" in validated_data:
+                tags_data = validated_data.pop("tags")
+                recipe.tags.set(tags_data)
+            update_signatures([recipe.pk])
+            return super().update(recipe, validated_data)
 
     def get_is_favorited(self, recipe):
         return Favorite.objects.filter(
@@ -168,3 +255,17 @@ class FavoriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Recipe
         fields = ('id', 'name', 'image', 'cooking_time')
+
+
+class JobSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Job
+        fields = ('id',
+                  'kind',
+                  'status',
+                  'result',
+                  'error',
+                  'created_at',
+                  'started_at',
+                  'finished_at')
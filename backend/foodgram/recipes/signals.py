@@ -0,0 +1,136 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_init, post_save, pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from users.models import Follow, User
+from .cache import invalidate_recipes, invalidate_tag_ids
+from .changes import log_changes
+from .models import (
+    Change, Favorite, Ingredient, Recipe, RecipeIngredient, ShoppingCart, Tag,
+)
+
+AUTHOR_FIELDS = ('email', 'username', 'first_name', 'last_name')
+CATALOG_MODELS = {
+    Recipe: Change.RECIPES,
+    Tag: Change.TAGS,
+    Ingredient: Change.INGREDIENTS,
+}
+USER_RECIPE_MODELS = {
+    Favorite: Change.FAVORITES,
+    ShoppingCart: Change.SHOPPING_CART,
+}
+
+state = threading.local()
+
+
+@contextmanager
+def deferred_touch():
+    if getattr(state, 'touched', None) is not None:
+        yield
+        return
+    state.touched = set()
+    try:
+        yield
+        touched = state.touched
+    finally:
+        state.touched = None
+    if touched:
+        touch_recipes(touched)
+
+
+def touch_recipes(recipe_ids):
+    if getattr(state, 'touched', None) is not None:
+        state.touched.update(recipe_ids)
+        return
+    recipe_ids = list(recipe_ids)
+    Recipe.objects.filter(pk__in=recipe_ids).update(
+        updated_at=timezone.now())
+    invalidate_recipes(recipe_ids)
+    log_changes(Change.RECIPES, recipe_ids)
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def invalidate_recipe(sender, instance, **kwargs):
+    invalidate_recipes([instance.pk])
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def invalidate_recipe_ingredient(sender, instance, **kwargs):
+    touch_recipes([instance.recipe_id])
+
+
+def get_related_recipe_ids(instance):
+    if isinstance(instance, Tag):
+        return instance.recipes.values_list('id', flat=True)
+    return instance.ingredient_to_recipe.values_list('recipe_id', flat=True)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_recipe_relations(sender, instance, action, reverse, pk_set,
+                                **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            touch_recipes([instance.pk])
+    elif action == 'pre_clear':
+        touch_recipes(get_related_recipe_ids(instance))
+    elif action.startswith('post_'):
+        touch_recipes(pk_set)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver((post_save, pre_delete), sender=Tag)
+def invalidate_catalog_item(sender, instance, **kwargs):
+    touch_recipes(get_related_recipe_ids(instance))
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def invalidate_tag_slugs(sender, **kwargs):
+    invalidate_tag_ids()
+
+
+def get_author_values(instance):
+    # Read from __dict__ so deferred fields are not loaded one by one.
+    return tuple(instance.__dict__.get(field) for field in AUTHOR_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_author(sender, instance, **kwargs):
+    instance._author_values = get_author_values(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author(sender, instance, created, update_fields, **kwargs):
+    values = get_author_values(instance)
+    changed = values != instance._author_values
+    instance._author_values = values
+    if created or not changed or (
+            update_fields and update_fields.isdisjoint(AUTHOR_FIELDS)):
+        return
+    touch_recipes(instance.recipes.values_list('id', flat=True))
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=Tag)
+@receiver((post_save, post_delete), sender=Ingredient)
+def log_catalog_item(sender, instance, signal, **kwargs):
+    log_changes(CATALOG_MODELS[sender], [instance.pk],
+                deleted=signal is post_delete)
+
+
+@receiver((post_save, post_delete), sender=Favorite)
+@receiver((post_save, post_delete), sender=ShoppingCart)
+def log_user_recipe(sender, instance, signal, **kwargs):
+    log_changes(USER_RECIPE_MODELS[sender], [instance.recipe_id],
+                user_id=instance.user_id, deleted=signal is post_delete)
+
+
+@receiver((post_save, post_delete), sender=Follow)
+def log_follow(sender, instance, signal, **kwargs):
+    log_changes(Change.SUBSCRIPTIONS, [instance.author_id],
+                user_id=instance.user_id, deleted=signal is post_delete)
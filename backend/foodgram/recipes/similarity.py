@@ -0,0 +1,107 @@
+import hashlib
+import random
+from array import array
+from functools import reduce
+from operator import or_
+
+from django.db.models import Count, Q
+
+from .models import Recipe, RecipeBucket, RecipeIngredient, RecipeSignature
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS = NUM_PERMUTATIONS // BANDS
+PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+MAX_CANDIDATES = 200
+
+permutations_random = random.Random(20211)
+PERMUTATIONS = [
+    (permutations_random.randrange(1, PRIME),
+     permutations_random.randrange(0, PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def get_features(ingredient_ids, tag_ids):
+    return ([ingredient_id * 2 for ingredient_id in ingredient_ids]
+            + [tag_id * 2 + 1 for tag_id in tag_ids])
+
+
+def get_signature(features):
+    return array('I', (
+        min((a * feature + b) % PRIME for feature in features) & MAX_HASH
+        for a, b in PERMUTATIONS
+    ))
+
+
+def get_buckets(signature):
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS].tobytes()
+        digest = hashlib.blake2b(rows, digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, 'big', signed=True)))
+    return buckets
+
+
+def estimate_similarity(signature, other):
+    return sum(a == b for a, b in zip(signature, other)) / NUM_PERMUTATIONS
+
+
+def load_signature(data):
+    signature = array('I')
+    signature.frombytes(bytes(data))
+    return signature
+
+
+def get_recipe_features(recipe_ids):
+    features = {recipe_id: ([], []) for recipe_id in recipe_ids}
+    for recipe_id, ingredient_id in RecipeIngredient.objects.filter(
+            recipe_id__in=recipe_ids).values_list(
+            'recipe_id', 'ingredients_id'):
+        features[recipe_id][0].append(ingredient_id)
+    for recipe_id, tag_id in Recipe.tags.through.objects.filter(
+            recipe_id__in=recipe_ids).values_list('recipe_id', 'tag_id'):
+        features[recipe_id][1].append(tag_id)
+    return {recipe_id: get_features(*recipe_features)
+            for recipe_id, recipe_features in features.items()}
+
+
+def update_signatures(recipe_ids):
+    signatures = []
+    buckets = []
+    for recipe_id, features in get_recipe_features(recipe_ids).items():
+        if not features:
+            continue
+        signature = get_signature(features)
+        signatures.append(RecipeSignature(
+            recipe_id=recipe_id, signature=signature.tobytes()))
+        buckets.extend(
+            RecipeBucket(recipe_id=recipe_id, band=band, bucket=bucket)
+            for band, bucket in get_buckets(signature))
+    RecipeSignature.objects.filter(recipe_id__in=recipe_ids).delete()
+    RecipeBucket.objects.filter(recipe_id__in=recipe_ids).delete()
+    RecipeSignature.objects.bulk_create(signatures)
+    RecipeBucket.objects.bulk_create(buckets)
+
+
+def get_similar_recipe_ids(recipe, limit):
+    try:
+        signature = load_signature(recipe.signature.signature)
+    except RecipeSignature.DoesNotExist:
+        return []
+    buckets = get_buckets(signature)
+    candidate_ids = list(RecipeBucket.objects.filter(reduce(or_, (
+        Q(band=band, bucket=bucket) for band, bucket in buckets
+    )), recipe__deleted_at__isnull=True).exclude(
+        recipe_id=recipe.pk).values('recipe_id').annotate(
+        matches=Count('id')).order_by('-matches', 'recipe_id').values_list(
+        'recipe_id', flat=True)[:MAX_CANDIDATES])
+    scores = {
+        recipe_id: estimate_similarity(signature, load_signature(data))
+        for recipe_id, data in RecipeSignature.objects.filter(
+            recipe_id__in=candidate_ids).values_list(
+            'recipe_id', 'signature')
+    }
+    return sorted(scores, key=lambda recipe_id: (-scores[recipe_id],
+                                                 recipe_id))[:limit]
@@ -0,0 +1,37 @@
+import hashlib
+import os
+import time
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def _save(self, name, content):
+        name = self.get_content_name(name, content)
+        if self.exists(name):
+            os.utime(self.path(name))
+            return name
+        temp_name = super()._save(f'{name}.{uuid.uuid4().hex}.tmp', content)
+        os.replace(self.path(temp_name), self.path(name))
+        return name
+
+    def delete_stale(self, name, grace):
+        # Uploading a duplicate only touches the existing file, so a fresh
+        # mtime means a recipe may be about to reference it.
+        try:
+            if time.time() - os.path.getmtime(self.path(name)) < grace:
+                return False
+        except FileNotFoundError:
+            return False
+        self.delete(name)
+        return True
+
+    def get_content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(directory, digest[:2], digest + extension)
@@ -0,0 +1,82 @@
+from django.contrib.admin.sites import site
+from django.test import TestCase
+from django.urls import reverse
+
+from recipes.models import (
+    Favorite, Ingredient, Recipe, RecipeIngredient, ShoppingCart, Tag,
+)
+from users.models import Follow, User
+
+AUTHORS = 20
+RECIPES = 200
+
+
+class LargeTableAdminTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin',
+            first_name='Админ', last_name='Админов')
+        User.objects.bulk_create(
+            User(username=f'author{i}', email=f'author{i}@example.com')
+            for i in range(AUTHORS))
+        authors = list(User.objects.filter(username__startswith='author'))
+        tag = Tag.objects.create(name='Завтрак', color='#E26C2D',
+                                 slug='breakfast')
+        ingredient = Ingredient.objects.create(name='Соль',
+                                               measurement_unit='г')
+        Recipe.objects.bulk_create(
+            Recipe(author=authors[i % AUTHORS], name=f'Рецепт {i}',
+                   text='Описание', cooking_time=10, image='recipe.png')
+            for i in range(RECIPES))
+        recipes = list(Recipe.objects.all())
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe=recipe, tag=tag)
+            for recipe in recipes)
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredients=ingredient, amount=1)
+            for recipe in recipes)
+        for model in (Favorite, ShoppingCart):
+            model.objects.bulk_create(
+                model(user=author, recipe=recipe)
+                for author in authors for recipe in recipes[:10])
+        Follow.objects.bulk_create(
+            Follow(user=user, author=author)
+            for user in authors for author in authors if user != author)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelist_query_count_does_not_depend_on_rows(self):
+        # Session, user, changelist count and page rows, plus the tag filter
+        # choices for recipes.
+        expected = {
+            Recipe: 5,
+            RecipeIngredient: 4,
+            Favorite: 4,
+            ShoppingCart: 4,
+            Follow: 4,
+            User: 4,
+        }
+        for model, queries in expected.items():
+            opts = model._meta
+            url = reverse(
+                f'admin:{opts.app_label}_{opts.model_name}_changelist')
+            with self.subTest(model=opts.model_name):
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_search_uses_case_sensitive_lookups(self):
+        queryset, _ = site._registry[Recipe].get_search_results(
+            None, Recipe.objects.all(), 'author1')
+        lookups = {
+            lookup.lookup_name
+            for lookup in queryset.query.where.children[0].children
+        }
+        self.assertEqual(lookups, {'startswith', 'exact'})
+        self.assertEqual(queryset.count(), RECIPES // AUTHORS)
+        queryset, _ = site._registry[Recipe].get_search_results(
+            None, Recipe.objects.all(), 'AUTHOR1')
+        self.assertFalse(queryset.exists())
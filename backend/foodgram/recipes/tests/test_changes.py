@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from recipes.changes import get_latest_cursor, log_changes
+from recipes.models import Change, Favorite, Ingredient, Recipe, Tag
+from users.models import User
+
+URL = '/api/changes/'
+
+
+class ChangesFeedTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='user',
+                                       email='user@example.com')
+        cls.other = User.objects.create(username='other',
+                                        email='other@example.com')
+        cls.tag = Tag.objects.create(name='Завтрак', color='#E26C2D',
+                                     slug='breakfast')
+        cls.ingredient = Ingredient.objects.create(name='Соль',
+                                                   measurement_unit='г')
+        cls.recipe = Recipe.objects.create(
+            author=cls.user, name='Омлет', text='Описание', cooking_time=10,
+            image='recipe.png')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def age_changes(self):
+        Change.objects.update(
+            created_at=timezone.now() - timedelta(hours=1))
+        log_changes(Change.INGREDIENTS, [self.ingredient.pk])
+
+    def get(self, since=None):
+        params = {} if since is None else {'since': since}
+        response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_full_sync(self):
+        Favorite.objects.create(user=self.user, recipe=self.recipe)
+        data = self.get()
+        self.assertEqual(data['cursor'], str(get_latest_cursor()))
+        self.assertEqual(data['recipes'],
+                         {'updated': [self.recipe.pk], 'deleted': []})
+        self.assertEqual(data['tags']['updated'], [self.tag.pk])
+        self.assertEqual(data['ingredients']['updated'],
+                         [self.ingredient.pk])
+        self.assertEqual(data['favorites'],
+                         {'added': [self.recipe.pk], 'removed': []})
+
+    def test_delta(self):
+        self.age_changes()
+        cursor = self.get()['cursor']
+        tag = Tag.objects.create(name='Обед', color='#49B64E', slug='lunch')
+        Favorite.objects.create(user=self.other, recipe=self.recipe)
+        log_changes(Change.RECIPES, [self.recipe.pk], deleted=True)
+        data = self.get(cursor)
+        self.assertEqual(data['tags'], {'updated': [tag.pk], 'deleted': []})
+        self.assertEqual(data['recipes'],
+                         {'updated': [], 'deleted': [self.recipe.pk]})
+        self.assertEqual(data['favorites'], {'added': [], 'removed': []})
+        # Changes inside the overlap window are reported again.
+        self.assertEqual(self.get(data['cursor'])['tags']['updated'],
+                         [tag.pk])
+
+    def test_late_commit_is_not_skipped(self):
+        first = get_latest_cursor() + 1
+        Change.objects.create(id=first + 2, model=Change.TAGS,
+                              object_id=self.tag.pk)
+        cursor = self.get()['cursor']
+        self.assertEqual(cursor, str(first + 2))
+        # A transaction that took a lower id commits after the read.
+        Change.objects.create(id=first, model=Change.INGREDIENTS,
+                              object_id=self.ingredient.pk)
+        data = self.get(cursor)
+        self.assertEqual(data['ingredients']['updated'],
+                         [self.ingredient.pk])
+
+    def test_overlap_is_bounded(self):
+        self.age_changes()
+        data = self.get(get_latest_cursor())
+        self.assertEqual(data['ingredients']['updated'],
+                         [self.ingredient.pk])
+        self.assertEqual(data['tags']['updated'], [])
+        self.assertEqual(data['recipes']['updated'], [])
+
+    def test_invalid_cursor(self):
+        for since in ('abc', '-1', str(get_latest_cursor() + 1)):
+            with self.subTest(since=since):
+                response = self.client.get(URL, {'since': since})
+                self.assertEqual(response.status_code, 400)
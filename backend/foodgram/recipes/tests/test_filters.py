@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from recipes.cache import get_tag_ids
+from recipes.models import Recipe, Tag
+from users.models import User
+
+AUTHORS = 30
+RECIPES = 300
+URL = '/api/recipes/'
+
+
+class RecipeFilterTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(username=f'author{i}', email=f'author{i}@example.com')
+            for i in range(AUTHORS))
+        cls.authors = list(User.objects.order_by('id'))
+        cls.tags = [
+            Tag.objects.create(name=name, color=color, slug=slug)
+            for name, color, slug in (
+                ('Завтрак', '#E26C2D', 'breakfast'),
+                ('Обед', '#49B64E', 'lunch'),
+                ('Ужин', '#8775D2', 'dinner'),
+            )
+        ]
+        Recipe.objects.bulk_create(
+            Recipe(author=cls.authors[i % AUTHORS], name=f'Рецепт {i}',
+                   text='Описание', cooking_time=10, image='recipe.png')
+            for i in range(RECIPES))
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe=recipe, tag=cls.tags[i % 3])
+            for i, recipe in enumerate(Recipe.objects.order_by('id')))
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        get_tag_ids()
+
+    def count_queries(self, url):
+        cache.clear()
+        get_tag_ids()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data
+
+    def test_filters_add_no_queries(self):
+        author = self.authors[0]
+        unfiltered, _ = self.count_queries(URL)
+        filtered, data = self.count_queries(
+            f'{URL}?author={author.pk}&tags=breakfast&tags=lunch')
+        self.assertEqual(filtered, unfiltered)
+        self.assertTrue(data['results'])
+        self.assertEqual(data['count'], Recipe.objects.filter(
+            author=author, tags__slug__in=('breakfast', 'lunch')).count())
+        for recipe in data['results']:
+            self.assertEqual(recipe['author']['id'], author.pk)
+
+    def test_invalid_values_return_400_without_queries(self):
+        for query in ('tags=breakfast&tags=unknown', 'author=abc'):
+            with self.subTest(query=query):
+                with self.assertNumQueries(0):
+                    response = self.client.get(f'{URL}?{query}')
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,124 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from recipes.jobs import HANDLERS, get_queue
+from recipes.models import (
+    Ingredient, Job, Recipe, RecipeIngredient, ShoppingCart,
+)
+from users.models import User
+
+
+class JobQueueTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='user',
+                                       email='user@example.com')
+        recipe = Recipe.objects.create(
+            author=cls.user, name='Омлет', text='Описание', cooking_time=10,
+            image='recipe.png')
+        RecipeIngredient.objects.create(
+            recipe=recipe, amount=3, ingredients=Ingredient.objects.create(
+                name='Яйца', measurement_unit='шт'))
+        ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+
+    def setUp(self):
+        self.queue = get_queue()
+
+    def make_job(self, status, age, attempts=1, result=''):
+        moment = timezone.now() - timedelta(seconds=age)
+        finished = status in (Job.DONE, Job.FAILED)
+        job = Job.objects.create(kind='shopping_cart_export', status=status,
+                                 attempts=attempts, started_at=moment,
+                                 finished_at=moment if finished else None)
+        if result:
+            job.result.save(result, ContentFile(b'data'))
+        return job
+
+    def test_claim_and_run(self):
+        job = self.queue.enqueue('shopping_cart_export', {'format': 'csv'},
+                                 user=self.user)
+        claimed = self.queue.claim()
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, Job.RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNotNone(claimed.started_at)
+        self.assertIsNone(self.queue.claim())
+        self.queue.run(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE, job.error)
+        self.assertIsNotNone(job.finished_at)
+        with job.result.open() as result:
+            self.assertIn('Яйца'.encode(), result.read())
+
+    def test_failed_handler(self):
+        def fail(job, payload):
+            raise RuntimeError('boom')
+
+        with mock.patch.dict(HANDLERS, {'fail': fail}):
+            self.queue.enqueue('fail')
+            job = self.queue.claim()
+            self.queue.run(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn('boom', job.error)
+
+    def test_requeue_stale(self):
+        lease = settings.JOB_LEASE_TIMEOUT
+        stale = self.make_job(Job.RUNNING, lease + 60)
+        exhausted = self.make_job(Job.RUNNING, lease + 60,
+                                  attempts=settings.JOB_MAX_ATTEMPTS)
+        fresh = self.make_job(Job.RUNNING, 60)
+        self.assertEqual(self.queue.requeue_stale(), 1)
+        for job in (stale, exhausted, fresh):
+            job.refresh_from_db()
+        self.assertEqual(stale.status, Job.PENDING)
+        self.assertIsNone(stale.started_at)
+        self.assertEqual(exhausted.status, Job.FAILED)
+        self.assertEqual(fresh.status, Job.RUNNING)
+        self.assertEqual(self.queue.claim().pk, stale.pk)
+
+    def test_prune(self):
+        retention = settings.JOB_RETENTION
+        expired = self.make_job(Job.DONE, retention + 60,
+                                result='expired.csv')
+        failed = self.make_job(Job.FAILED, retention + 60)
+        recent = self.make_job(Job.DONE, 60, result='recent.csv')
+        running = self.make_job(Job.RUNNING, retention + 60)
+        storage = expired.result.storage
+        self.assertEqual(self.queue.prune(), 2)
+        self.assertEqual(
+            set(Job.objects.values_list('pk', flat=True)),
+            {recent.pk, running.pk})
+        self.assertFalse(storage.exists(expired.result.name))
+        self.assertTrue(storage.exists(recent.result.name))
+        self.assertFalse(Job.objects.filter(pk=failed.pk).exists())
+
+    def test_run_jobs_command(self):
+        job = self.queue.enqueue('shopping_cart_export', {'format': 'csv'},
+                                 user=self.user)
+        call_command('run_jobs', '--once', stdout=mock.Mock(),
+                     stderr=mock.Mock())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE, job.error)
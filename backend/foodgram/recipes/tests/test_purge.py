@@ -0,0 +1,134 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes.jobs import get_queue
+from recipes.models import (
+    Change, Favorite, Ingredient, Job, Recipe, RecipeIngredient, ShoppingCart,
+    Tag,
+)
+from recipes.similarity import update_signatures
+from users.models import Follow, User
+
+PASSWORD = 'Secret-password-1'
+
+
+class PurgeTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings = override_settings(MEDIA_ROOT=cls.media_root,
+                                         IMAGE_DELETE_GRACE=0)
+        cls.settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.storage = Recipe._meta.get_field('image').storage
+        self.own_image = self.storage.save('media/recipes/images/own.png',
+                                           ContentFile(b'own'))
+        self.shared_image = self.storage.save(
+            'media/recipes/images/shared.png', ContentFile(b'shared'))
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password=PASSWORD)
+        self.reader = User.objects.create_user(
+            username='reader', email='reader@example.com', password=PASSWORD)
+        tag = Tag.objects.create(name='Завтрак', color='#E26C2D',
+                                 slug='breakfast')
+        ingredient = Ingredient.objects.create(name='Соль',
+                                               measurement_unit='г')
+        self.own, self.shared, self.other = [
+            Recipe.objects.create(author=author, name=name, text='Описание',
+                                  cooking_time=10, image=image)
+            for author, name, image in (
+                (self.author, 'Омлет', self.own_image),
+                (self.author, 'Каша', self.shared_image),
+                (self.reader, 'Суп', self.shared_image),
+            )
+        ]
+        for recipe in (self.own, self.shared, self.other):
+            recipe.tags.add(tag)
+            RecipeIngredient.objects.create(recipe=recipe,
+                                            ingredients=ingredient, amount=1)
+            Favorite.objects.create(user=self.reader, recipe=recipe)
+            ShoppingCart.objects.create(user=self.reader, recipe=recipe)
+        update_signatures([self.own.pk, self.shared.pk, self.other.pk])
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.author, author=self.reader)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def run_jobs(self):
+        queue = get_queue()
+        job = queue.claim()
+        while job is not None:
+            queue.run(job)
+            self.assertEqual(job.status, Job.DONE, job.error)
+            job = queue.claim()
+
+    def get_dependent_rows(self, recipe_ids):
+        rows = {}
+        for field in Recipe._meta.get_fields(include_hidden=True):
+            if field.auto_created and (field.one_to_many
+                                       or field.one_to_one):
+                model = field.related_model
+                count = model._default_manager.filter(**{
+                    f'{field.field.name}__in': recipe_ids}).count()
+                if count:
+                    rows[model.__name__] = count
+        return rows
+
+    def get_tombstones(self, model):
+        return set(Change.objects.filter(model=model, deleted=True)
+                   .values_list('user_id', 'object_id'))
+
+    def test_purge_recipe(self):
+        response = self.client.delete(f'/api/recipes/{self.own.pk}/')
+        self.assertEqual(response.status_code, 204)
+        response = self.client.get(f'/api/recipes/{self.own.pk}/')
+        self.assertEqual(response.status_code, 404)
+        self.run_jobs()
+        self.assertFalse(Recipe.objects.filter(pk=self.own.pk).exists())
+        self.assertEqual(self.get_dependent_rows([self.own.pk]), {})
+        self.assertEqual(self.get_dependent_rows([self.shared.pk])['Favorite'],
+                         1)
+        self.assertEqual(self.get_tombstones(Change.RECIPES),
+                         {(None, self.own.pk)})
+        self.assertEqual(self.get_tombstones(Change.FAVORITES),
+                         {(self.reader.pk, self.own.pk)})
+        self.assertEqual(self.get_tombstones(Change.SHOPPING_CART),
+                         {(self.reader.pk, self.own.pk)})
+        self.assertFalse(self.storage.exists(self.own_image))
+        self.assertTrue(self.storage.exists(self.shared_image))
+
+    def test_purge_user(self):
+        response = self.client.delete(f'/api/users/{self.author.pk}/',
+                                      {'current_password': PASSWORD},
+                                      format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Recipe.objects.visible().filter(
+            author=self.author).exists())
+        self.assertEqual(self.get_tombstones(Change.RECIPES),
+                         {(None, self.own.pk), (None, self.shared.pk)})
+        self.run_jobs()
+        recipe_ids = [self.own.pk, self.shared.pk]
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertFalse(Recipe.objects.filter(pk__in=recipe_ids).exists())
+        self.assertEqual(self.get_dependent_rows(recipe_ids), {})
+        self.assertEqual(len(self.get_dependent_rows([self.other.pk])), 6)
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(self.get_tombstones(Change.SUBSCRIPTIONS),
+                         {(self.reader.pk, self.author.pk)})
+        self.assertEqual(self.get_tombstones(Change.FAVORITES),
+                         {(self.reader.pk, pk) for pk in recipe_ids})
+        self.assertFalse(self.storage.exists(self.own_image))
+        self.assertTrue(self.storage.exists(self.shared_image))
@@ -0,0 +1,68 @@
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from recipes.renderers import FastJSONRenderer
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    golden = {
+        'decimal': {'amount': Decimal('12.50'), 'zero': Decimal('0')},
+        'datetime': {
+            'aware': datetime(2021, 5, 1, 12, 30, 15, 123456,
+                              tzinfo=timezone.utc),
+            'offset': datetime(2021, 5, 1, 12, 30,
+                               tzinfo=timezone(timedelta(hours=3))),
+            'naive': datetime(2021, 5, 1, 12, 30, 15),
+            'date': date(2021, 5, 1),
+            'time': time(12, 30, 15, 500000),
+            'timedelta': timedelta(days=1, seconds=5),
+        },
+        'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'lazy': gettext_lazy('Избранное'),
+        'non_str_keys': {2: 'два', False: 'нет', None: 'пусто'},
+        'line_separators': 'a b c',
+        'unicode': 'Рецепт 🍲',
+        'numbers': [0, -1, 2 ** 53, 0.1, 0.0001, 123456.789, -2.5, None],
+        'big_int': [2 ** 70],
+        'exponent_floats': [1e300, 1e-7, 1e20, 1e16, -1.5e-9, 1e-05],
+        'exponent_decimals': [Decimal('1E+20'), Decimal('0.00000001')],
+        'exponent_keys': {1e20: 'много', 1e-7: 'мало'},
+        'text_like_exponents': ['1e5', 'null', 'version 2e'],
+        'nested': [{'id': 1, 'tags': [{'slug': 'breakfast'}]}],
+    }
+
+    def test_output_matches_json_renderer(self):
+        for name, data in self.golden.items():
+            with self.subTest(name=name):
+                self.assertEqual(FastJSONRenderer().render(data),
+                                 JSONRenderer().render(data))
+
+    def test_plain_numbers_are_rendered_by_orjson(self):
+        data = self.golden['numbers']
+        with mock.patch.object(JSONRenderer, 'render') as render:
+            FastJSONRenderer().render(data)
+        render.assert_not_called()
+
+    def test_line_separators_are_escaped(self):
+        self.assertEqual(
+            FastJSONRenderer().render(self.golden['line_separators']),
+            b'"a\\u2028b\\u2029c"')
+
+    def test_non_finite_numbers_are_rejected(self):
+        for value in (float('nan'), float('inf'), float('-inf'),
+                      Decimal('NaN'), Decimal('Infinity')):
+            cases = [{'value': value}, [1, [value]]]
+            if isinstance(value, float):
+                cases.append({value: 1})
+            for data in cases:
+                with self.subTest(data=data):
+                    with self.assertRaises(ValueError):
+                        JSONRenderer().render(data)
+                    with self.assertRaises(ValueError):
+                        FastJSONRenderer().render(data)
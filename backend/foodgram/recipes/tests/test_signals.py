@@ -0,0 +1,146 @@
+import base64
+import shutil
+import tempfile
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from recipes.models import Change, Ingredient, Recipe, Tag
+from users.models import User
+
+PNG = base64.b64encode(base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8Dw'
+    'HwAFBQIAX8jx0gAAAABJRU5ErkJggg==')).decode()
+
+
+class AuthorChangeTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author',
+                                         email='author@example.com')
+        Recipe.objects.bulk_create(
+            Recipe(author=cls.author, name=f'Рецепт {i}', text='Описание',
+                   cooking_time=10, image='recipe.png')
+            for i in range(3))
+
+    def get_recipe_changes(self):
+        return Change.objects.filter(model=Change.RECIPES).count()
+
+    def test_password_change_does_not_touch_recipes(self):
+        author = User.objects.get(pk=self.author.pk)
+        before = self.get_recipe_changes()
+        author.set_password('new-password')
+        author.save()
+        author.last_login = None
+        author.save()
+        self.assertEqual(self.get_recipe_changes(), before)
+
+    def test_author_field_change_touches_recipes(self):
+        author = User.objects.get(pk=self.author.pk)
+        before = self.get_recipe_changes()
+        author.first_name = 'Иван'
+        author.save()
+        self.assertEqual(self.get_recipe_changes(), before + 3)
+        author.save()
+        self.assertEqual(self.get_recipe_changes(), before + 3)
+
+    def test_deferred_author_field_change_touches_recipes(self):
+        author = User.objects.only('id').get(pk=self.author.pk)
+        before = self.get_recipe_changes()
+        author.username = 'renamed'
+        author.save(update_fields=['username'])
+        self.assertEqual(self.get_recipe_changes(), before + 3)
+
+
+class RecipeWriteTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author',
+                                         email='author@example.com')
+        cls.tags = [
+            Tag.objects.create(name=f'Тэг {i}', color=f'#00000{i}',
+                               slug=f'tag{i}')
+            for i in range(3)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(name=f'Ингредиент {i}',
+                                      measurement_unit='г')
+            for i in range(8)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def get_body(self, ingredients, tags):
+        return {
+            'tags': [tag.pk for tag in tags],
+            'ingredients': [{'id': ingredient.pk, 'amount': 2}
+                            for ingredient in ingredients],
+            'name': 'Омлет',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': f'data:image/png;base64,{PNG}',
+        }
+
+    def write(self, method, url, body):
+        changes = Change.objects.filter(model=Change.RECIPES)
+        before = changes.count()
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, body, format='json')
+        self.assertIn(response.status_code, (200, 201))
+        writes = [query for query in queries.captured_queries
+                  if not query['sql'].startswith('SELECT')]
+        return response.data, len(writes), changes.count() - before
+
+    def test_create_touches_recipe_once(self):
+        _, few, few_changes = self.write(
+            'post', '/api/recipes/',
+            self.get_body(self.ingredients[:1], self.tags[:1]))
+        data, many, many_changes = self.write(
+            'post', '/api/recipes/',
+            self.get_body(self.ingredients, self.tags))
+        self.assertEqual(many, few)
+        self.assertEqual(many_changes, few_changes)
+        self.assertEqual(many_changes, 2)
+        self.assertEqual(len(data['ingredients']), 8)
+        self.assertEqual(len(data['tags']), 3)
+
+    def test_update_touches_recipe_once(self):
+        data, _, _ = self.write(
+            'post', '/api/recipes/',
+            self.get_body(self.ingredients[:1], self.tags[:1]))
+        url = f'/api/recipes/{data["id"]}/'
+        _, few, few_changes = self.write(
+            'patch', url, self.get_body(self.ingredients[1:2], self.tags[1:2]))
+        data, many, many_changes = self.write(
+            'patch', url, self.get_body(self.ingredients, self.tags[::2]))
+        self.assertEqual(many, few)
+        self.assertEqual(many_changes, few_changes)
+        self.assertEqual(many_changes, 2)
+        self.assertEqual(
+            {ingredient['name'] for ingredient in data['ingredients']},
+            {ingredient.name for ingredient in self.ingredients})
+
+    def test_duplicate_ingredients_leave_nothing_behind(self):
+        body = self.get_body(self.ingredients[:1] * 2, self.tags[:1])
+        response = self.client.post('/api/recipes/', body, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Recipe.objects.filter(name='Омлет').exists())
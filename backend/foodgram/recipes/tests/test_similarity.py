@@ -0,0 +1,86 @@
+import random
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from recipes.similarity import (
+    MAX_CANDIDATES, get_recipe_features, get_similar_recipe_ids,
+    update_signatures,
+)
+from users.models import User
+
+CLUSTERS = 20
+VARIANTS = 9
+INGREDIENTS = 8
+
+
+def get_jaccard(features, other):
+    features, other = set(features), set(other)
+    return len(features & other) / len(features | other)
+
+
+class SimilarRecipesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(2021)
+        author = User.objects.create(username='author',
+                                     email='author@example.com')
+        tag = Tag.objects.create(name='Обед', color='#49B64E', slug='lunch')
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'Ингредиент {i}', measurement_unit='г')
+            for i in range(200))
+        pool = list(Ingredient.objects.values_list('id', flat=True))
+        compositions = []
+        for _ in range(CLUSTERS):
+            base = rng.sample(pool, INGREDIENTS)
+            compositions.append(base)
+            for _ in range(VARIANTS):
+                variant = list(base)
+                variant[rng.randrange(INGREDIENTS)] = rng.choice(
+                    [pk for pk in pool if pk not in base])
+                compositions.append(variant)
+        Recipe.objects.bulk_create(
+            Recipe(author=author, name=f'Рецепт {i}', text='Описание',
+                   cooking_time=10, image='recipe.png')
+            for i in range(len(compositions)))
+        cls.recipe_ids = list(Recipe.objects.order_by('id').values_list(
+            'id', flat=True))
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe_id=recipe_id, ingredients_id=pk, amount=1)
+            for recipe_id, composition in zip(cls.recipe_ids, compositions)
+            for pk in composition)
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe_id=recipe_id, tag=tag)
+            for recipe_id in cls.recipe_ids)
+        update_signatures(cls.recipe_ids)
+        cls.features = get_recipe_features(cls.recipe_ids)
+
+    def get_exact_neighbours(self, recipe_id, threshold):
+        return {
+            other for other in self.recipe_ids
+            if other != recipe_id and get_jaccard(
+                self.features[recipe_id], self.features[other]) >= threshold
+        }
+
+    def test_recall_against_exact_jaccard(self):
+        found = expected = 0
+        for recipe_id in self.recipe_ids[::VARIANTS + 1]:
+            neighbours = self.get_exact_neighbours(recipe_id, 0.7)
+            similar = get_similar_recipe_ids(
+                Recipe.objects.get(pk=recipe_id), len(neighbours))
+            found += len(neighbours & set(similar))
+            expected += len(neighbours)
+        self.assertEqual(expected, CLUSTERS * VARIANTS)
+        self.assertGreaterEqual(found / expected, 0.95)
+
+    def test_candidates_are_ranked_in_database(self):
+        recipe = Recipe.objects.get(pk=self.recipe_ids[0])
+        with CaptureQueriesContext(connection) as queries:
+            get_similar_recipe_ids(recipe, 10)
+        candidate_query = next(query['sql'] for query in queries
+                               if 'recipes_recipebucket' in query['sql'])
+        self.assertIn('GROUP BY', candidate_query)
+        self.assertIn(f'LIMIT {MAX_CANDIDATES}', candidate_query)
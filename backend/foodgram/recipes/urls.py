@@ -2,8 +2,8 @@ from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
 from .views import (
-    APIFavorite, APIShoppingCart, IngredientsViewSet, RecipeViewSet,
-    TagViewSet,
+    APIChanges, APIFavorite, APIShoppingCart, APIShoppingCartExport,
+    APIShoppingCartExports, IngredientsViewSet, RecipeViewSet, TagViewSet,
 )
 
 router = SimpleRouter()
@@ -13,10 +13,19 @@ router.register('ingredients', IngredientsViewSet, basename='ingredients')
 router.register('recipes', RecipeViewSet, basename='recipes')
 
 urlpatterns = [
+    path('changes/', APIChanges.as_view(), name='changes'),
     path(
         'recipes/download_shopping_cart/',
         APIShoppingCart.as_view(),
         name='download_shopping_cart'),
+    path(
+        'recipes/shopping_cart_exports/',
+        APIShoppingCartExports.as_view(),
+        name='shopping_cart_exports'),
+    path(
+        'recipes/shopping_cart_exports/<int:id>/',
+        APIShoppingCartExport.as_view(),
+        name='shopping_cart_export'),
     path('', include(router.urls)),
     path(
         'recipes/<int:id>/favorite/',
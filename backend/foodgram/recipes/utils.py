@@ -1,54 +1,62 @@
+import csv
+import hashlib
 import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
-from django.db.models import F, Sum
+from django.conf import settings
+from django.db.models import Count, F, Max, Sum
 from django.http import FileResponse
 from django.shortcuts import get_object_or_404
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from rest_framework import status
 from rest_framework.response import Response
 
-from .models import Recipe, RecipeIngredient
+from foodgram.metrics import PDF_RENDER_TIME
+from users.models import Follow
+from .models import Favorite, Recipe, RecipeIngredient, ShoppingCart
+from .pdf import render_shopping_list
 from .serializers import FavoriteSerializer
 
 
-def get_shopping_list(self, request):
-    user = request.user
-    shopping_list = RecipeIngredient.objects.filter(
-        recipe__shopping_cart__user=user).values(
+@lru_cache(maxsize=None)
+def get_pdf_executor():
+    return ProcessPoolExecutor(
+        max_workers=settings.PDF_RENDER_PROCESSES,
+        mp_context=multiprocessing.get_context('spawn'))
+
+
+def get_shopping_list_data(user):
+    return list(RecipeIngredient.objects.filter(
+        recipe__shopping_cart__user=user,
+        recipe__deleted_at__isnull=True).values(
         name=F('ingredients__name'),
         unit=F('ingredients__measurement_unit')
-    ).annotate(amount=Sum('amount'))
-    font = 'DejaVuSerif'
-    pdfmetrics.registerFont(
-        TTFont('DejaVuSerif', 'DejaVuSerif.ttf', 'UTF-8'))
-    buffer = io.BytesIO()
-    pdf_file = canvas.Canvas(buffer)
-    pdf_file.setFont(font, 24)
-    pdf_file.drawString(
-        150,
-        800,
-        'Список покупок.'
-    )
-    pdf_file.setFont(font, 14)
-    from_bottom = 750
-    for number, ingredient in enumerate(shopping_list, start=1):
-        pdf_file.drawString(
-            50,
-            from_bottom,
-            f'{number}.  {ingredient["name"]} - {ingredient["amount"]} '
-            f'{ingredient["unit"]}'
-        )
-        from_bottom -= 20
-        if from_bottom <= 50:
-            from_bottom = 800
-            pdf_file.showPage()
-            pdf_file.setFont(font, 14)
-    pdf_file.showPage()
-    pdf_file.save()
-    buffer.seek(0)
-    return FileResponse(buffer, as_attachment=True,
+    ).annotate(amount=Sum('amount')))
+
+
+def render_shopping_list_csv(shopping_list):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(('Название', 'Количество', 'Единица измерения'))
+    for ingredient in shopping_list:
+        writer.writerow(
+            (ingredient['name'], ingredient['amount'], ingredient['unit']))
+    return buffer.getvalue().encode('utf-8-sig')
+
+
+def get_shopping_list(self, request):
+    shopping_list = get_shopping_list_data(request.user)
+    with PDF_RENDER_TIME.time():
+        if settings.PDF_RENDER_PROCESSES:
+            pdf = get_pdf_executor().submit(
+                render_shopping_list, shopping_list, settings.PDF_FONT_PATH
+            ).result()
+        else:
+            pdf = render_shopping_list(shopping_list, settings.PDF_FONT_PATH)
+    return FileResponse(io.BytesIO(pdf), as_attachment=True,
                         filename='shopping_list.pdf')
 
 
@@ -62,7 +70,42 @@ def delete(request, id, model):
 
 def post(request, id, model):
     user = request.user
-    recipe = get_object_or_404(Recipe, id=id)
+    recipe = get_object_or_404(Recipe.objects.visible(), id=id)
     model.objects.get_or_create(user=user, recipe=recipe)
     serializer = FavoriteSerializer(recipe, context={'request': request})
     return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+def get_viewer_version(user):
+    if not user.is_authenticated:
+        return ()
+    version = [user.pk]
+    for model in (Favorite, ShoppingCart, Follow):
+        version.extend(model.objects.filter(user=user).aggregate(
+            Count('id'), Max('id')).values())
+    return tuple(version)
+
+
+def get_recipes_version(queryset):
+    return tuple(queryset.order_by().aggregate(
+        Count('id'), Max('updated_at')).values())
+
+
+def get_etag(request, version):
+    data = (
+        sorted(request.query_params.lists()),
+        version,
+        get_viewer_version(request.user),
+    )
+    return hashlib.md5(repr(data).encode()).hexdigest()
+
+
+def conditional(request, etag, get_response):
+    etag = quote_etag(etag)
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return response
+    response = get_response()
+    if response.status_code == status.HTTP_200_OK:
+        response['ETag'] = etag
+    return response
@@ -1,20 +1,35 @@
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from foodgram.db import ReplicaReadMixin
+from .changes import get_changes, log_changes, parse_cursor
 from .filters import IngredientSearchFilter, RecipeFilter
-from .models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from .jobs import EXPORT_FORMATS, get_queue
+from .models import (
+    Change, Favorite, Ingredient, Job, Recipe, ShoppingCart, Tag,
+)
 from .pagination import LimitPageNumberPagination
+from .parsers import FastJSONParser, MultiPartJSONParser
 from .permissions import AuthorOrReadOnly
 from .serializers import (
-    CreateRecipeSerializer, IngredientSerializer, TagSerializer,
+    CreateRecipeSerializer, IngredientSerializer, JobSerializer, TagSerializer,
     ViewRecipeSerializer,
 )
-from .utils import delete, get_shopping_list, post
+from .similarity import get_similar_recipe_ids
+from .utils import (
+    conditional, delete, get_etag, get_recipes_version, get_shopping_list,
+    post,
+)
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (AllowAny,)
@@ -22,7 +37,7 @@ class TagViewSet(viewsets.ModelViewSet):
     http_method_names = ['get']
 
 
-class IngredientsViewSet(viewsets.ModelViewSet):
+class IngredientsViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (AllowAny,)
@@ -32,8 +47,8 @@ class IngredientsViewSet(viewsets.ModelViewSet):
     search_fields = ('^name',)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
-    queryset = Recipe.objects.all()
+class RecipeViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = Recipe.objects.visible()
     serializer_class = ViewRecipeSerializer
     permission_classes = (AuthorOrReadOnly,)
     filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
@@ -41,12 +56,49 @@ class RecipeViewSet(viewsets.ModelViewSet):
     filterset_class = RecipeFilter
     filterset_fields = ('tags', 'author')
     ordering_fields = ('id',)
+    parser_classes = (FastJSONParser, MultiPartJSONParser)
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return ViewRecipeSerializer
         return CreateRecipeSerializer
 
+    def perform_destroy(self, recipe):
+        with transaction.atomic():
+            recipe.deleted_at = timezone.now()
+            recipe.save(update_fields=['deleted_at'])
+            log_changes(Change.RECIPES, [recipe.pk], deleted=True)
+            get_queue().enqueue('purge_recipe', {'recipe_id': recipe.pk})
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        recipe = self.get_object()
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 6)),
+                               50))
+        except ValueError:
+            limit = 6
+        recipe_ids = get_similar_recipe_ids(recipe, limit)
+        recipes = self.get_queryset().in_bulk(recipe_ids)
+        serializer = self.get_serializer(
+            [recipes[recipe_id] for recipe_id in recipe_ids
+             if recipe_id in recipes], many=True)
+        return Response(serializer.data)
+
+    def list(self, request, *args, **kwargs):
+        etag = get_etag(request, get_recipes_version(
+            self.filter_queryset(self.get_queryset())))
+        return conditional(
+            request, etag, lambda: super(RecipeViewSet, self).list(
+                request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        recipe = self.get_object()
+        etag = get_etag(request, (recipe.pk, recipe.updated_at))
+        return conditional(
+            request, etag,
+            lambda: Response(self.get_serializer(recipe).data))
+
 
 class APIFavorite(APIView):
 
@@ -67,3 +119,40 @@ class APIShoppingCart(APIView):
 
     def post(self, request, id):
         return post(request, id, ShoppingCart)
+
+
+class APIShoppingCartExports(APIView):
+
+    def post(self, request):
+        export_format = request.data.get('format', 'pdf')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'format': f'Допустимые форматы: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST)
+        job = get_queue().enqueue('shopping_cart_export',
+                                  {'format': export_format},
+                                  user=request.user)
+        serializer = JobSerializer(job, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class APIShoppingCartExport(APIView):
+
+    def get(self, request, id):
+        job = get_object_or_404(Job, id=id, user=request.user)
+        serializer = JobSerializer(job, context={'request': request})
+        return Response(serializer.data)
+
+
+class APIChanges(APIView):
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = parse_cursor(since)
+            except ValueError:
+                return Response({'since': 'Некорректный курсор'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        return Response(get_changes(request.user, since))
@@ -1,14 +1,20 @@
 from django.contrib import admin
 
+from recipes.admin import LargeTableAdmin
 from .models import Follow, User
 
-admin.site.register(Follow)
+
+@admin.register(Follow)
+class FollowAdmin(LargeTableAdmin):
+    list_display = ('user', 'author')
+    list_select_related = ('user', 'author')
+    search_fields = ('=user__username', '=author__username')
+    autocomplete_fields = ('user', 'author')
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(LargeTableAdmin):
     list_display = (
         'username',
     )
-    list_filter = ('email', 'username')
-    search_fields = ('username', 'email',)
+    search_fields = ('^username', '^email',)
@@ -1,7 +1,16 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
 
 
+class UserQuerySet(models.QuerySet):
+    def visible(self):
+        return self.filter(deleted_at__isnull=True)
+
+
+class SoftDeleteUserManager(UserManager.from_queryset(UserQuerySet)):
+    pass
+
+
 class User(AbstractUser):
     email = models.EmailField(
         max_length=254,
@@ -25,6 +34,14 @@ class User(AbstractUser):
         max_length=150,
         verbose_name='Пароль'
     )
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name='Дата удаления'
+    )
+
+    objects = SoftDeleteUserManager()
 
     REQUIRED_FIELDS = ['email', 'first_name', 'last_name']
 
@@ -41,6 +58,8 @@ class Follow(models.Model):
                              related_name='follower')
     author = models.ForeignKey(User, on_delete=models.CASCADE,
                                related_name='following')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True,
+                                      verbose_name='Дата подписки')
 
     class Meta:
         constraints = [
@@ -107,7 +107,7 @@ class SubscriptionsSerializer(serializers.ModelSerializer):
                   'recipes_count',)
 
     def get_recipes(self, author):
-        recipes = author.recipes.all()
+        recipes = author.recipes.visible()
         return FollowingRecipeSerializer(recipes, many=True).data
 
     def get_is_subscribed(self, author):
@@ -116,4 +116,4 @@ class SubscriptionsSerializer(serializers.ModelSerializer):
             user=self.context['request'].user).exists()
 
     def get_recipes_count(self, author):
-        return author.recipes.count()
+        return author.recipes.visible().count()
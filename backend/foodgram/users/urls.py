@@ -2,12 +2,13 @@ from django.conf.urls import url
 from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
-from .views import ListSubscriptions, Subscribe
+from .views import ListSubscriptions, Subscribe, UserViewSet
 
 router = SimpleRouter()
 
 router.register('users/subscriptions', ListSubscriptions,
                 basename='subscriptions')
+router.register('users', UserViewSet, basename='users')
 
 urlpatterns = [
     path('', include(router.urls)),
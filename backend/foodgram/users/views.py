@@ -1,18 +1,42 @@
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from djoser.views import UserViewSet as DjoserUserViewSet
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from foodgram.db import ReplicaReadMixin
+from recipes.changes import log_changes
+from recipes.jobs import get_queue
+from recipes.models import Change
 from .models import Follow, User
 from .serializers import SubscriptionsSerializer
 
 
-class ListSubscriptions(viewsets.ModelViewSet):
+class UserViewSet(DjoserUserViewSet):
+
+    def get_queryset(self):
+        return super().get_queryset().visible()
+
+    def perform_destroy(self, user):
+        with transaction.atomic():
+            user.deleted_at = timezone.now()
+            user.is_active = False
+            user.save(update_fields=['deleted_at', 'is_active'])
+            recipes = user.recipes.visible()
+            log_changes(Change.RECIPES, recipes.values_list('id', flat=True),
+                        deleted=True)
+            recipes.update(deleted_at=user.deleted_at)
+            get_queue().enqueue('purge_user', {'user_id': user.pk})
+
+
+class ListSubscriptions(ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = SubscriptionsSerializer
 
     def get_queryset(self):
         user = self.request.user
-        return User.objects.filter(following__user=user)
+        return User.objects.visible().filter(following__user=user)
 
 
 class Subscribe(APIView):
@@ -27,7 +51,7 @@ class Subscribe(APIView):
 
     def post(self, request, id):
         user = request.user
-        author = get_object_or_404(User, id=id)
+        author = get_object_or_404(User.objects.visible(), id=id)
         Follow.objects.get_or_create(user=user, author=author)
         serializer = SubscriptionsSerializer(author, context={'request':
                                                               request})